@@ -0,0 +1,65 @@
+/*
+ * TinyRC4 C Extension
+ * Native keystream generator for the non-visualized encrypt/decrypt path.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include "tinyrc4_core.h"
+
+static PyObject *
+py_rc4_stream(PyObject *self, PyObject *args)
+{
+    Py_buffer key;
+    Py_ssize_t n;
+    uint8_t S[8], T[8];
+    PyObject *result;
+
+    if (!PyArg_ParseTuple(args, "y*n", &key, &n))
+        return NULL;
+
+    if (key.len < 1 || key.len > 8) {
+        PyBuffer_Release(&key);
+        PyErr_SetString(PyExc_ValueError, "Key must have 1-8 values");
+        return NULL;
+    }
+    if (n < 0) {
+        PyBuffer_Release(&key);
+        PyErr_SetString(PyExc_ValueError, "Stream length must be non-negative");
+        return NULL;
+    }
+
+    rc4_init(S, T, (const uint8_t *)key.buf, (size_t)key.len);
+    PyBuffer_Release(&key);
+
+    result = PyBytes_FromStringAndSize(NULL, n);
+    if (result == NULL)
+        return NULL;
+
+    Py_BEGIN_ALLOW_THREADS
+    rc4_stream(S, T, (uint8_t *)PyBytes_AS_STRING(result), (size_t)n);
+    Py_END_ALLOW_THREADS
+
+    return result;
+}
+
+static PyMethodDef tinyrc4_methods[] = {
+    {"rc4_stream", py_rc4_stream, METH_VARARGS,
+     "rc4_stream(key, n) -> bytes\n\n"
+     "Generate n TinyRC4 keystream values (0-7) for the given key bytes."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef tinyrc4_module = {
+    PyModuleDef_HEAD_INIT,
+    "_tinyrc4",
+    "Native TinyRC4 keystream generator.",
+    -1,
+    tinyrc4_methods
+};
+
+PyMODINIT_FUNC
+PyInit__tinyrc4(void)
+{
+    return PyModule_Create(&tinyrc4_module);
+}
@@ -0,0 +1 @@
+def rc4_stream(key: bytes, n: int, /) -> bytes: ...
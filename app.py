@@ -2,13 +2,70 @@
 Flask Web Application for TinyRC4 Visualizer
 """
 
-from flask import Flask, render_template, request, jsonify
+import functools
+from flask import Flask, render_template, request
+from kombu.exceptions import OperationalError
 from tinyrc4 import TinyRC4
-import json
+from tasks import celery_app, encrypt_steps_task, decrypt_steps_task
+import orjson
 
 app = Flask(__name__)
 rc4 = TinyRC4()
 
+# Step-by-step requests with at least this many characters are run by a
+# Celery worker; the client polls /api/result/<job_id> for the outcome.
+# Measured inline cost (steps + orjson): ~3 ms at 256 chars, ~13 ms at 1000,
+# ~57 ms at 4000, so only inputs that would hold a worker for a noticeable
+# time are worth the queueing and polling overhead.
+ASYNC_STEPS_MIN_LEN = 4000
+
+# Serialized step-by-step responses cached per worker. Only inputs up to
+# STEPS_CACHE_MAX_LEN characters (~200KB of JSON each) are cached, which
+# bounds the cache at ~25MB.
+STEPS_CACHE_SIZE = 128
+STEPS_CACHE_MAX_LEN = 256
+
+def json_default(obj):
+    """Serialize types orjson does not handle natively."""
+    if isinstance(obj, bytes):
+        # S/T snapshots in steps are stored as bytes; the frontend expects arrays
+        return list(obj)
+    raise TypeError
+
+def dump_json(payload):
+    """Serialize payload to JSON bytes with orjson."""
+    return orjson.dumps(payload, default=json_default)
+
+def json_body_response(body):
+    """Wrap already-serialized JSON bytes in a response."""
+    return app.response_class(body, mimetype='application/json')
+
+def json_response(payload):
+    """Serialize payload with orjson into a JSON response."""
+    return json_body_response(dump_json(payload))
+
+@functools.lru_cache(maxsize=STEPS_CACHE_SIZE)
+def _do_encrypt_steps(plaintext, key):
+    """Serialized step-by-step encryption, cached by (plaintext, key)."""
+    return dump_json(rc4.encrypt_with_steps(plaintext, key))
+
+@functools.lru_cache(maxsize=STEPS_CACHE_SIZE)
+def _do_decrypt_steps(ciphertext, key):
+    """Serialized step-by-step decryption, cached by (ciphertext, key)."""
+    return dump_json(rc4.decrypt_with_steps(ciphertext, key))
+
+def encrypt_steps_body(plaintext, key):
+    """Serialized step-by-step encryption, cached for short inputs."""
+    if len(plaintext) <= STEPS_CACHE_MAX_LEN:
+        return _do_encrypt_steps(plaintext, key)
+    return dump_json(rc4.encrypt_with_steps(plaintext, key))
+
+def decrypt_steps_body(ciphertext, key):
+    """Serialized step-by-step decryption, cached for short inputs."""
+    if len(ciphertext) <= STEPS_CACHE_MAX_LEN:
+        return _do_decrypt_steps(ciphertext, key)
+    return dump_json(rc4.decrypt_with_steps(ciphertext, key))
+
 @app.route('/')
 def index():
     """Serve the main HTML page."""
@@ -18,21 +75,21 @@ def index():
 def api_encrypt():
     """API endpoint for instant encryption."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         plaintext = data.get('plaintext', '').strip()
         key = data.get('key', '').strip()
         
         if not plaintext or not key:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Plaintext and key are required'
             })
         
         result = rc4.encrypt(plaintext, key)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': f'Server error: {str(e)}'
         })
@@ -41,21 +98,21 @@ def api_encrypt():
 def api_decrypt():
     """API endpoint for instant decryption."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         ciphertext = data.get('ciphertext', '').strip()
         key = data.get('key', '').strip()
         
         if not ciphertext or not key:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Ciphertext and key are required'
             })
         
         result = rc4.decrypt(ciphertext, key)
-        return jsonify(result)
+        return json_response(result)
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': f'Server error: {str(e)}'
         })
@@ -64,21 +121,28 @@ def api_decrypt():
 def api_encrypt_steps():
     """API endpoint for step-by-step encryption."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         plaintext = data.get('plaintext', '').strip()
         key = data.get('key', '').strip()
         
         if not plaintext or not key:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Plaintext and key are required'
             })
         
-        result = rc4.encrypt_with_steps(plaintext, key)
-        return jsonify(result)
+        if len(plaintext) >= ASYNC_STEPS_MIN_LEN:
+            try:
+                job = encrypt_steps_task.apply_async(args=(plaintext, key), retry=False)
+                return json_response({'pending': True, 'job_id': job.id})
+            except OperationalError as e:
+                # Broker unreachable: run the job inline instead of failing
+                app.logger.warning('Celery dispatch failed, running inline: %s', e)
+        
+        return json_body_response(encrypt_steps_body(plaintext, key))
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': f'Server error: {str(e)}'
         })
@@ -87,26 +151,65 @@ def api_encrypt_steps():
 def api_decrypt_steps():
     """API endpoint for step-by-step decryption."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data())
         ciphertext = data.get('ciphertext', '').strip()
         key = data.get('key', '').strip()
         
         if not ciphertext or not key:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Ciphertext and key are required'
             })
         
-        result = rc4.decrypt_with_steps(ciphertext, key)
-        return jsonify(result)
+        if len(ciphertext) >= ASYNC_STEPS_MIN_LEN:
+            try:
+                job = decrypt_steps_task.apply_async(args=(ciphertext, key), retry=False)
+                return json_response({'pending': True, 'job_id': job.id})
+            except OperationalError as e:
+                # Broker unreachable: run the job inline instead of failing
+                app.logger.warning('Celery dispatch failed, running inline: %s', e)
+        
+        return json_body_response(decrypt_steps_body(ciphertext, key))
+        
+    except Exception as e:
+        return json_response({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        })
+
+@app.route('/api/result/<job_id>', methods=['GET'])
+def api_result(job_id):
+    """API endpoint for polling an offloaded step-by-step job."""
+    try:
+        job = celery_app.AsyncResult(job_id)
+        
+        if job.state in ('PENDING', 'STARTED', 'RETRY'):
+            return json_response({
+                'pending': True,
+                'job_id': job_id,
+                'state': job.state
+            })
+        
+        if job.state == 'SUCCESS':
+            response = json_response(job.result)
+        else:
+            response = json_response({
+                'success': False,
+                'error': f'Job failed: {str(job.info)}'
+            })
+        
+        # The result has been delivered; drop it from the backend
+        job.forget()
+        return response
         
     except Exception as e:
-        return jsonify({
+        return json_response({
             'success': False,
             'error': f'Server error: {str(e)}'
         })
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; use gunicorn (see gunicorn.conf.py) in production
+    app.run(host='0.0.0.0', port=5000)
 
 
@@ -7,6 +7,9 @@ Standalone command-line interface for TinyRC4 encryption/decryption
 import sys
 from tinyrc4 import TinyRC4
 
+# Translation table that deletes valid characters, leaving only invalid ones
+_DEL_VALID = str.maketrans('', '', 'ABCDEFGH')
+
 def print_banner():
     """Print application banner."""
     print("=" * 60)
@@ -56,8 +59,7 @@ def get_user_input(prompt, validator=None):
 def validate_text(text):
     """Validate text input (A-H characters only)."""
     text = text.upper()
-    valid_chars = set('ABCDEFGH')
-    invalid_chars = set(text) - valid_chars
+    invalid_chars = dict.fromkeys(text.translate(_DEL_VALID))
     
     if invalid_chars:
         raise ValueError(f"Invalid characters: {', '.join(invalid_chars)}. Only A-H allowed.")
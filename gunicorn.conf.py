@@ -0,0 +1,14 @@
+"""
+Gunicorn configuration for serving the TinyRC4 Visualizer in production.
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+
+bind = '0.0.0.0:5000'
+
+# One worker process per CPU core, each serving requests on a small thread pool.
+# TinyRC4 keeps no per-request state, so workers share nothing.
+workers = multiprocessing.cpu_count()
+worker_class = 'gthread'
+threads = 4
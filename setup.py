@@ -0,0 +1,22 @@
+"""
+Build script for the optional TinyRC4 compiled modules.
+Run `python setup.py build_ext --inplace` to compile _tinyrc4.
+Set TINYRC4_MYPYC=1 to also compile tinyrc4.py with mypyc (requires mypy).
+"""
+
+import os
+from setuptools import setup, Extension
+
+ext_modules = [
+    Extension('_tinyrc4', sources=['_tinyrc4.c'], depends=['tinyrc4_core.h']),
+]
+
+if os.environ.get('TINYRC4_MYPYC') == '1':
+    from mypyc.build import mypycify
+    ext_modules += mypycify(['tinyrc4.py'])
+
+setup(
+    name='tinyrc4-visualizer',
+    py_modules=['tinyrc4'],
+    ext_modules=ext_modules,
+)
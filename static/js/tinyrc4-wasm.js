@@ -0,0 +1,110 @@
+/**
+ * TinyRC4 WebAssembly Loader
+ * Runs instant encryption/decryption in the browser using the WASM build of
+ * the C core (see wasm/build.sh). If the module has not been built or fails
+ * to load, window.tinyrc4Wasm stays undefined and the visualizer falls back
+ * to the Flask API.
+ */
+
+const ALPHABET = 'ABCDEFGH';
+
+function textToInts(text) {
+    const upperText = text.toUpperCase();
+    const values = new Uint8Array(upperText.length);
+
+    for (let n = 0; n < upperText.length; n++) {
+        const value = ALPHABET.indexOf(upperText[n]);
+        if (value === -1) {
+            throw new Error(`Invalid character '${upperText[n]}'. Only A-H allowed.`);
+        }
+        values[n] = value;
+    }
+    return values;
+}
+
+function intsToText(values) {
+    return Array.from(values, v => ALPHABET[v]).join('');
+}
+
+function intsToBinary(values) {
+    return Array.from(values, v => v.toString(2).padStart(3, '0')).join('');
+}
+
+function parseKey(keyStr) {
+    const keyParts = keyStr.split(',').map(part => {
+        const trimmed = part.trim();
+        if (!/^[+-]?\d+$/.test(trimmed)) {
+            throw new Error('Key must contain only integers separated by commas');
+        }
+        return parseInt(trimmed, 10);
+    });
+
+    for (const k of keyParts) {
+        if (k < 0 || k > 7) {
+            throw new Error(`Key values must be 0-7, got ${k}`);
+        }
+    }
+    if (keyParts.length < 1 || keyParts.length > 8) {
+        throw new Error('Key must have 1-8 values');
+    }
+    return keyParts;
+}
+
+function createProcessor(module) {
+    const crypt = (key, values) => {
+        const n = values.length;
+        const keyPtr = module._malloc(key.length);
+        const inPtr = module._malloc(n || 1);
+        const outPtr = module._malloc(n || 1);
+
+        try {
+            module.HEAPU8.set(key, keyPtr);
+            module.HEAPU8.set(values, inPtr);
+            if (module._tinyrc4_crypt(keyPtr, key.length, inPtr, outPtr, n) !== 0) {
+                throw new Error('Key must have 1-8 values');
+            }
+            return module.HEAPU8.slice(outPtr, outPtr + n);
+        } finally {
+            module._free(keyPtr);
+            module._free(inPtr);
+            module._free(outPtr);
+        }
+    };
+
+    // Same response shape as the /api/encrypt and /api/decrypt endpoints
+    const process = (text, keyStr, source, target) => {
+        try {
+            const key = parseKey(keyStr);
+            const sourceInts = textToInts(text);
+            const targetInts = crypt(Uint8Array.from(key), sourceInts);
+
+            return {
+                success: true,
+                [source]: text,
+                [`${source}_binary`]: intsToBinary(sourceInts),
+                [target]: intsToText(targetInts),
+                [`${target}_binary`]: intsToBinary(targetInts),
+                key: key
+            };
+        } catch (error) {
+            return {
+                success: false,
+                error: error.message
+            };
+        }
+    };
+
+    return {
+        encrypt: (plaintext, keyStr) => process(plaintext, keyStr, 'plaintext', 'ciphertext'),
+        decrypt: (ciphertext, keyStr) => process(ciphertext, keyStr, 'ciphertext', 'plaintext')
+    };
+}
+
+(async () => {
+    try {
+        const { default: createModule } = await import('./tinyrc4.mjs');
+        window.tinyrc4Wasm = createProcessor(await createModule());
+    } catch (error) {
+        console.info('TinyRC4 WASM module unavailable, using server API:', error.message);
+    }
+})();
@@ -139,21 +139,28 @@ class TinyRC4Visualizer {
         }
 
         try {
-            const endpoint = operation === 'encrypt' ? '/api/encrypt' : '/api/decrypt';
-            const dataKey = operation === 'encrypt' ? 'plaintext' : 'ciphertext';
+            let result;
             
-            const response = await fetch(endpoint, {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    [dataKey]: text,
-                    key: key
-                })
-            });
-
-            const result = await response.json();
+            if (window.tinyrc4Wasm) {
+                // Run in the browser when the WASM build is available
+                result = window.tinyrc4Wasm[operation](text, key);
+            } else {
+                const endpoint = operation === 'encrypt' ? '/api/encrypt' : '/api/decrypt';
+                const dataKey = operation === 'encrypt' ? 'plaintext' : 'ciphertext';
+                
+                const response = await fetch(endpoint, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        [dataKey]: text,
+                        key: key
+                    })
+                });
+
+                result = await response.json();
+            }
             
             if (result.success) {
                 this.showInstantResult(result, operation);
@@ -227,7 +234,12 @@ class TinyRC4Visualizer {
                 })
             });
 
-            const result = await response.json();
+            let result = await response.json();
+            
+            // Long inputs are processed in the background; wait for the job
+            if (result.pending) {
+                result = await this.pollJobResult(result.job_id);
+            }
             
             if (result.success) {
                 this.initializeVisualizer(result, operation);
@@ -239,6 +251,38 @@ class TinyRC4Visualizer {
         }
     }
 
+    async pollJobResult(jobId) {
+        // Poll quickly at first, backing off to once a second, and give up
+        // after a minute (e.g. no worker running or the result expired)
+        const maxWaitMs = 60000;
+        let delayMs = 100;
+        let waitedMs = 0;
+        
+        while (waitedMs < maxWaitMs) {
+            await new Promise(resolve => setTimeout(resolve, delayMs));
+            waitedMs += delayMs;
+            delayMs = Math.min(delayMs * 2, 1000);
+            
+            const response = await fetch(`/api/result/${jobId}`);
+            if (!response.ok) {
+                return {
+                    success: false,
+                    error: `Server error: ${response.status} ${response.statusText}`
+                };
+            }
+            
+            const result = await response.json();
+            if (!result.pending) {
+                return result;
+            }
+        }
+        
+        return {
+            success: false,
+            error: 'Timed out waiting for the step-by-step result. Please try again.'
+        };
+    }
+
     initializeVisualizer(result, operation) {
         this.currentSteps = result.steps;
         this.currentStepIndex = 0;
@@ -0,0 +1,54 @@
+"""
+Celery tasks for TinyRC4 Visualizer
+Step-by-step runs for long inputs are offloaded to a background worker.
+Start a worker with: celery -A tasks worker
+"""
+
+import os
+from dataclasses import asdict
+from celery import Celery
+from tinyrc4 import TinyRC4
+
+celery_app = Celery(
+    'tinyrc4',
+    broker=os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0'),
+    backend=os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+)
+
+# Fail fast when Redis is down so the web app can fall back to running the
+# job inline; the default retry policy blocks apply_async for ~20 s.
+celery_app.conf.result_backend_transport_options = {
+    'retry_policy': {
+        'max_retries': 2,
+        'interval_start': 0,
+        'interval_step': 0.2,
+        'interval_max': 0.5
+    }
+}
+# Results are read once by /api/result and then forgotten; the expiry only
+# reaps abandoned jobs, so keep it well above the client's 60 s polling window.
+celery_app.conf.result_expires = 300
+rc4 = TinyRC4()
+
+def _plain_result(result):
+    """Turn Step objects into dicts with list snapshots.
+
+    kombu's JSON encoder would otherwise wrap each bytes snapshot in a
+    type marker, nearly doubling the payload stored in Redis.
+    """
+    if result['success']:
+        result['steps'] = [
+            {**asdict(step), 'S': list(step.S), 'T': list(step.T)}
+            for step in result['steps']
+        ]
+    return result
+
+@celery_app.task
+def encrypt_steps_task(plaintext, key):
+    """Step-by-step encryption in a worker process."""
+    return _plain_result(rc4.encrypt_with_steps(plaintext, key))
+
+@celery_app.task
+def decrypt_steps_task(ciphertext, key):
+    """Step-by-step decryption in a worker process."""
+    return _plain_result(rc4.decrypt_with_steps(ciphertext, key))
@@ -3,41 +3,132 @@ TinyRC4 Algorithm Implementation
 Based on the lecture material for educational visualization purposes.
 """
 
+import functools
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, ClassVar
+
+try:
+    # Native keystream generator (build with `python setup.py build_ext --inplace`)
+    from _tinyrc4 import rc4_stream
+except ImportError:
+    rc4_stream = None  # type: ignore[assignment]
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+# Keystreams are cached per key in blocks of this many values, so messages
+# of similar length share one entry. Longer messages bypass the cache.
+_STREAM_BLOCK = 64
+_STREAM_CACHE_MAX_LEN = 4096
+_STREAM_CACHE_SIZE = 256
+
+# Below this length the Python XOR beats NumPy's array setup cost.
+_NUMPY_XOR_MIN_LEN = 32
+
+# Below this length a per-value table lookup beats the octal round-trip.
+_OCTAL_FORMAT_MIN_LEN = 32
+
+# Character to 3-bit mapping (A=000, B=001, ..., H=111)
+_CHAR_TO_BITS = MappingProxyType({
+    'A': 0, 'B': 1, 'C': 2, 'D': 3, 
+    'E': 4, 'F': 5, 'G': 6, 'H': 7
+})
+_BITS_TO_CHAR = MappingProxyType({v: k for k, v in _CHAR_TO_BITS.items()})
+
+
+def _translation_tables() -> tuple[bytes, bytes]:
+    """Build the encode/decode byte tables from the character map."""
+    # ASCII 'A'-'H' <-> 3-bit values 0-7. Bytes outside the alphabet map
+    # to 0xFF so they can be detected.
+    enc_tbl = bytearray(b'\xff' * 256)
+    dec_tbl = bytearray(b'\xff' * 256)
+    for char, value in _CHAR_TO_BITS.items():
+        enc_tbl[ord(char)] = value
+        dec_tbl[value] = ord(char)
+    return bytes(enc_tbl), bytes(dec_tbl)
+
+
+_ENC_TBL, _DEC_TBL = _translation_tables()
+
+
+@dataclass(slots=True)
+class Step:
+    """A single visualization step; fields a step does not use stay None."""
+    phase: str
+    step_number: int
+    description: str
+    S: bytes
+    T: bytes
+    i: int | None = None
+    j: int | None = None
+    swap: dict | None = None
+    t: int | None = None
+    k: int | None = None
+    k_binary: str | None = None
+
+
 class TinyRC4:
-    def __init__(self):
-        # Character to 3-bit mapping (A=000, B=001, ..., H=111)
-        self.char_to_bits = {
-            'A': 0, 'B': 1, 'C': 2, 'D': 3, 
-            'E': 4, 'F': 5, 'G': 6, 'H': 7
-        }
-        self.bits_to_char = {v: k for k, v in self.char_to_bits.items()}
+    # Character to 3-bit mapping (A=000, B=001, ..., H=111), read-only
+    char_to_bits: ClassVar[MappingProxyType[str, int]] = _CHAR_TO_BITS
+    bits_to_char: ClassVar[MappingProxyType[int, str]] = _BITS_TO_CHAR
+    
+    # Binary string for each 3-bit value (0 -> '000', ..., 7 -> '111')
+    _BIN3: ClassVar[tuple[str, ...]] = tuple(f"{v:03b}" for v in range(8))
+    
+    # Byte table mapping 3-bit values to ASCII octal digits (0 -> '0', ..., 7 -> '7')
+    _OCT_TBL: ClassVar[bytes] = bytes.maketrans(bytes(range(8)), b'01234567')
+    
+    def __init__(self) -> None:
+        # Per-instance LRU cache of keystream prefixes, keyed by (key, length)
+        self._keystream_for: Callable[[tuple[int, ...], int], bytes] = (
+            functools.lru_cache(maxsize=_STREAM_CACHE_SIZE)(self._keystream)
+        )
+    
+    def _text_to_ints(self, text: str) -> bytes:
+        """Convert text (A-H) to bytes of 3-bit values."""
+        text = text.upper()
+        values = text.encode('ascii', 'replace').translate(_ENC_TBL)
+        invalid = values.find(0xFF)
+        if invalid != -1:
+            raise ValueError(f"Invalid character '{text[invalid]}'. Only A-H allowed.")
+        return values
+    
+    def _ints_to_text(self, values: bytes | bytearray) -> str:
+        """Convert bytes of 3-bit values to text (A-H)."""
+        return bytes(values).translate(_DEC_TBL).decode('ascii')
+    
+    def _ints_to_binary(self, values: bytes) -> str:
+        """Convert 3-bit values to binary string representation."""
+        if len(values) < _OCTAL_FORMAT_MIN_LEN:
+            return ''.join([self._BIN3[v] for v in values])
+        
+        # Each 3-bit value is one octal digit: parse the digits as a base-8
+        # number and format it in base 2, padded to 3 bits per value
+        digits = bytes(values).translate(self._OCT_TBL)
+        return format(int(digits, 8), f'0{3 * len(values)}b')
     
-    def text_to_binary(self, text):
+    def text_to_binary(self, text: str) -> str:
         """Convert text (A-H) to binary string representation."""
-        binary_parts = []
-        for char in text.upper():
-            if char in self.char_to_bits:
-                binary_parts.append(f"{self.char_to_bits[char]:03b}")
-            else:
-                raise ValueError(f"Invalid character '{char}'. Only A-H allowed.")
-        return ''.join(binary_parts)
+        return self._ints_to_binary(self._text_to_ints(text))
     
-    def binary_to_text(self, binary_str):
+    def binary_to_text(self, binary_str: str) -> str:
         """Convert binary string to text (A-H)."""
         if len(binary_str) % 3 != 0:
             raise ValueError("Binary string length must be multiple of 3")
         
-        text_parts = []
+        values = bytearray()
         for i in range(0, len(binary_str), 3):
             bit_group = binary_str[i:i+3]
             value = int(bit_group, 2)
-            if value in self.bits_to_char:
-                text_parts.append(self.bits_to_char[value])
-            else:
+            if not 0 <= value <= 7:
                 raise ValueError(f"Invalid binary value '{bit_group}'")
-        return ''.join(text_parts)
+            values.append(value)
+        return self._ints_to_text(values)
     
-    def parse_key(self, key_str):
+    def parse_key(self, key_str: str) -> list[int]:
         """Parse comma-separated key string to list of integers."""
         try:
             key_parts = [int(x.strip()) for x in key_str.split(',')]
@@ -52,7 +143,7 @@ class TinyRC4:
                 raise ValueError("Key must contain only integers separated by commas")
             raise e
     
-    def initialize_arrays(self, key):
+    def initialize_arrays(self, key: list[int]) -> tuple[list[int], list[int]]:
         """Initialize S and T arrays according to TinyRC4 algorithm."""
         N = len(key)
         
@@ -64,58 +155,105 @@ class TinyRC4:
         
         return S, T
     
-    def permute_s_array(self, S, T):
+    def permute_s_array(self, S: list[int], T: list[int]) -> list[int]:
         """Permute S array based on T array."""
+        # All index arithmetic is mod 8, written as "& 7" (N = 8 is a power of two)
         j = 0
         for i in range(8):
-            j = (j + S[i] + T[i]) % 8
+            j = (j + S[i] + T[i]) & 7
             S[i], S[j] = S[j], S[i]  # Swap
         return S
     
-    def generate_stream_with_steps(self, plaintext_binary, key):
+    def generate_stream(self, key: list[int], length: int) -> list[int]:
+        """Generate encryption stream without step tracking."""
+        if rc4_stream is not None:
+            return list(rc4_stream(bytes(key), length))
+        
+        S, T = self.initialize_arrays(key)
+        S = self.permute_s_array(S, T)
+        
+        i, j = 0, 0
+        stream = []
+        for _ in range(length):
+            i = (i + 1) & 7
+            j = (j + S[i]) & 7
+            S[i], S[j] = S[j], S[i]
+            t = (S[i] + S[j]) & 7
+            stream.append(S[t])
+        
+        return stream
+    
+    def _keystream(self, key: tuple[int, ...], length: int) -> bytes:
+        """Generate the keystream for a key tuple as bytes."""
+        return bytes(self.generate_stream(list(key), length))
+    
+    def _cached_stream(self, key: list[int], length: int) -> bytes:
+        """Return the first `length` stream values for key, reusing cached keystreams."""
+        padded = -(-length // _STREAM_BLOCK) * _STREAM_BLOCK
+        return self._keystream_for(tuple(key), padded)[:length]
+    
+    def _xor(self, values: bytes, stream: bytes) -> bytes:
+        """XOR 3-bit values with the stream, returning bytes."""
+        if np is not None and len(values) >= _NUMPY_XOR_MIN_LEN:
+            return np.bitwise_xor(
+                np.frombuffer(values, np.uint8),
+                np.frombuffer(stream, np.uint8)
+            ).tobytes()
+        return bytes([v ^ s for v, s in zip(values, stream)])
+    
+    def _encrypt_stream(self, values: bytes, key: list[int]) -> bytes:
+        """XOR 3-bit values with the stream as it is generated, returning bytes."""
+        if rc4_stream is not None:
+            return self._xor(values, rc4_stream(bytes(key), len(values)))
+        
+        S, T = self.initialize_arrays(key)
+        S = self.permute_s_array(S, T)
+        
+        i, j = 0, 0
+        output = bytearray(len(values))
+        for n, value in enumerate(values):
+            i = (i + 1) & 7
+            j = (j + S[i]) & 7
+            S[i], S[j] = S[j], S[i]
+            output[n] = value ^ S[(S[i] + S[j]) & 7]
+        
+        return bytes(output)
+    
+    def generate_stream_with_steps(
+        self, plaintext_ints: bytes, key: list[int]
+    ) -> tuple[list[int], list[Step]]:
         """Generate encryption stream with detailed step tracking."""
         steps = []
         
-        # Convert plaintext to list of 3-bit integers
-        plaintext_ints = []
-        for i in range(0, len(plaintext_binary), 3):
-            plaintext_ints.append(int(plaintext_binary[i:i+3], 2))
-        
         # Initialize arrays
         S, T = self.initialize_arrays(key)
         
+        # Snapshots are immutable bytes, shared by consecutive steps and only
+        # re-taken after S mutates; T never changes once initialized.
+        S_snapshot = bytes(S)
+        T_snapshot = bytes(T)
+        
         # Add initialization step
-        steps.append({
-            'phase': 'init',
-            'step_number': 0,
-            'description': 'Initialize S and T arrays',
-            'S': S.copy(),
-            'T': T.copy(),
-            'i': None,
-            'j': None,
-            'swap': None,
-            't': None,
-            'k': None,
-            'k_binary': None
-        })
+        steps.append(Step(
+            phase='init',
+            step_number=0,
+            description='Initialize S and T arrays',
+            S=S_snapshot,
+            T=T_snapshot
+        ))
         
         # Permute S array
         S = self.permute_s_array(S, T)
+        S_snapshot = bytes(S)
         
         # Add permutation step
-        steps.append({
-            'phase': 'init',
-            'step_number': 1,
-            'description': 'Permute S array based on T',
-            'S': S.copy(),
-            'T': T.copy(),
-            'i': None,
-            'j': None,
-            'swap': None,
-            't': None,
-            'k': None,
-            'k_binary': None
-        })
+        steps.append(Step(
+            phase='init',
+            step_number=1,
+            description='Permute S array based on T',
+            S=S_snapshot,
+            T=T_snapshot
+        ))
         
         # Generate stream
         i, j = 0, 0
@@ -123,178 +261,116 @@ class TinyRC4:
         
         for step_num, plaintext_int in enumerate(plaintext_ints):
             # Increment i
-            i = (i + 1) % 8
-            steps.append({
-                'phase': 'generate',
-                'step_number': step_num * 3 + 2,
-                'description': f'Increment i: {i}',
-                'S': S.copy(),
-                'T': T.copy(),
-                'i': i,
-                'j': j,
-                'swap': None,
-                't': None,
-                'k': None,
-                'k_binary': None
-            })
+            i = (i + 1) & 7
+            steps.append(Step(
+                phase='generate',
+                step_number=step_num * 3 + 2,
+                description=f'Increment i: {i}',
+                S=S_snapshot,
+                T=T_snapshot,
+                i=i,
+                j=j
+            ))
             
             # Update j
-            j = (j + S[i]) % 8
-            steps.append({
-                'phase': 'generate',
-                'step_number': step_num * 3 + 3,
-                'description': f'Update j: j = (j + S[{i}]) mod 8 = ({j - S[i]} + {S[i]}) mod 8 = {j}',
-                'S': S.copy(),
-                'T': T.copy(),
-                'i': i,
-                'j': j,
-                'swap': None,
-                't': None,
-                'k': None,
-                'k_binary': None
-            })
+            j = (j + S[i]) & 7
+            steps.append(Step(
+                phase='generate',
+                step_number=step_num * 3 + 3,
+                description=f'Update j: j = (j + S[{i}]) mod 8 = ({j - S[i]} + {S[i]}) mod 8 = {j}',
+                S=S_snapshot,
+                T=T_snapshot,
+                i=i,
+                j=j
+            ))
             
             # Swap S[i] and S[j]
             S[i], S[j] = S[j], S[i]
-            steps.append({
-                'phase': 'generate',
-                'step_number': step_num * 3 + 4,
-                'description': f'Swap S[{i}] and S[{j}]: {S[j]} ↔ {S[i]}',
-                'S': S.copy(),
-                'T': T.copy(),
-                'i': i,
-                'j': j,
-                'swap': {'pos1': i, 'pos2': j},
-                't': None,
-                'k': None,
-                'k_binary': None
-            })
+            S_snapshot = bytes(S)
+            steps.append(Step(
+                phase='generate',
+                step_number=step_num * 3 + 4,
+                description=f'Swap S[{i}] and S[{j}]: {S[j]} ↔ {S[i]}',
+                S=S_snapshot,
+                T=T_snapshot,
+                i=i,
+                j=j,
+                swap={'pos1': i, 'pos2': j}
+            ))
             
             # Calculate t and k
-            t = (S[i] + S[j]) % 8
+            t = (S[i] + S[j]) & 7
             k = S[t]
-            k_binary = f"{k:03b}"
+            k_binary = self._BIN3[k]
             
-            steps.append({
-                'phase': 'generate',
-                'step_number': step_num * 3 + 5,
-                'description': f'Calculate k: t = (S[{i}] + S[{j}]) mod 8 = ({S[i]} + {S[j]}) mod 8 = {t}, k = S[{t}] = {k} = {k_binary}',
-                'S': S.copy(),
-                'T': T.copy(),
-                'i': i,
-                'j': j,
-                'swap': None,
-                't': t,
-                'k': k,
-                'k_binary': k_binary
-            })
+            steps.append(Step(
+                phase='generate',
+                step_number=step_num * 3 + 5,
+                description=f'Calculate k: t = (S[{i}] + S[{j}]) mod 8 = ({S[i]} + {S[j]}) mod 8 = {t}, k = S[{t}] = {k} = {k_binary}',
+                S=S_snapshot,
+                T=T_snapshot,
+                i=i,
+                j=j,
+                t=t,
+                k=k,
+                k_binary=k_binary
+            ))
             
             stream.append(k)
         
         return stream, steps
     
-    def encrypt_with_steps(self, plaintext, key_str):
-        """Encrypt plaintext with detailed step tracking."""
+    def _process(
+        self, text: str, key_str: str, source: str, target: str, with_steps: bool = False
+    ) -> dict[str, Any]:
+        """Run the cipher over text, labelling input/output fields as source/target."""
         try:
             key = self.parse_key(key_str)
-            plaintext_binary = self.text_to_binary(plaintext)
-            
-            stream, steps = self.generate_stream_with_steps(plaintext_binary, key)
+            source_ints = self._text_to_ints(text)
             
-            # Convert plaintext binary to integers for XOR
-            plaintext_ints = []
-            for i in range(0, len(plaintext_binary), 3):
-                plaintext_ints.append(int(plaintext_binary[i:i+3], 2))
-            
-            # Perform XOR
-            ciphertext_ints = [p ^ s for p, s in zip(plaintext_ints, stream)]
-            
-            # Convert to binary string
-            ciphertext_binary = ''.join(f"{c:03b}" for c in ciphertext_ints)
-            ciphertext = self.binary_to_text(ciphertext_binary)
-            
-            return {
-                'success': True,
-                'plaintext': plaintext,
-                'plaintext_binary': plaintext_binary,
-                'ciphertext': ciphertext,
-                'ciphertext_binary': ciphertext_binary,
-                'key': key,
-                'stream': stream,
-                'steps': steps
-            }
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
-    
-    def decrypt_with_steps(self, ciphertext, key_str):
-        """Decrypt ciphertext with detailed step tracking."""
-        try:
-            key = self.parse_key(key_str)
-            ciphertext_binary = self.text_to_binary(ciphertext)
-            
-            stream, steps = self.generate_stream_with_steps(ciphertext_binary, key)
-            
-            # Convert ciphertext binary to integers for XOR
-            ciphertext_ints = []
-            for i in range(0, len(ciphertext_binary), 3):
-                ciphertext_ints.append(int(ciphertext_binary[i:i+3], 2))
-            
-            # Perform XOR (same as encryption for stream ciphers)
-            plaintext_ints = [c ^ s for c, s in zip(ciphertext_ints, stream)]
-            
-            # Convert to binary string
-            plaintext_binary = ''.join(f"{p:03b}" for p in plaintext_ints)
-            plaintext = self.binary_to_text(plaintext_binary)
+            # XOR with the stream (same operation for encryption and decryption)
+            if with_steps:
+                stream, steps = self.generate_stream_with_steps(source_ints, key)
+                target_ints = self._xor(source_ints, bytes(stream))
+            elif len(source_ints) > _STREAM_CACHE_MAX_LEN:
+                target_ints = self._encrypt_stream(source_ints, key)
+            else:
+                stream_bytes = self._cached_stream(key, len(source_ints))
+                target_ints = self._xor(source_ints, stream_bytes)
             
-            return {
+            result = {
                 'success': True,
-                'ciphertext': ciphertext,
-                'ciphertext_binary': ciphertext_binary,
-                'plaintext': plaintext,
-                'plaintext_binary': plaintext_binary,
-                'key': key,
-                'stream': stream,
-                'steps': steps
+                source: text,
+                f'{source}_binary': self._ints_to_binary(source_ints),
+                target: self._ints_to_text(target_ints),
+                f'{target}_binary': self._ints_to_binary(target_ints),
+                'key': key
             }
+            if with_steps:
+                result['stream'] = stream
+                result['steps'] = steps
+            return result
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def encrypt(self, plaintext, key_str):
+    def encrypt(self, plaintext: str, key_str: str) -> dict[str, Any]:
         """Simple encryption without step tracking."""
-        result = self.encrypt_with_steps(plaintext, key_str)
-        if result['success']:
-            return {
-                'success': True,
-                'plaintext': result['plaintext'],
-                'plaintext_binary': result['plaintext_binary'],
-                'ciphertext': result['ciphertext'],
-                'ciphertext_binary': result['ciphertext_binary'],
-                'key': result['key']
-            }
-        else:
-            return result
+        return self._process(plaintext, key_str, 'plaintext', 'ciphertext')
     
-    def decrypt(self, ciphertext, key_str):
+    def decrypt(self, ciphertext: str, key_str: str) -> dict[str, Any]:
         """Simple decryption without step tracking."""
-        result = self.decrypt_with_steps(ciphertext, key_str)
-        if result['success']:
-            return {
-                'success': True,
-                'ciphertext': result['ciphertext'],
-                'ciphertext_binary': result['ciphertext_binary'],
-                'plaintext': result['plaintext'],
-                'plaintext_binary': result['plaintext_binary'],
-                'key': result['key']
-            }
-        else:
-            return result
-
+        return self._process(ciphertext, key_str, 'ciphertext', 'plaintext')
+    
+    def encrypt_with_steps(self, plaintext: str, key_str: str) -> dict[str, Any]:
+        """Encrypt plaintext with detailed step tracking."""
+        return self._process(plaintext, key_str, 'plaintext', 'ciphertext', with_steps=True)
+    
+    def decrypt_with_steps(self, ciphertext: str, key_str: str) -> dict[str, Any]:
+        """Decrypt ciphertext with detailed step tracking."""
+        return self._process(ciphertext, key_str, 'ciphertext', 'plaintext', with_steps=True)
 
 # Example usage and testing
 if __name__ == "__main__":
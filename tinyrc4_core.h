@@ -0,0 +1,55 @@
+/*
+ * TinyRC4 Core
+ * Dependency-free keystream routines shared by the Python extension
+ * (_tinyrc4.c) and the WebAssembly build (wasm/tinyrc4_wasm.c).
+ */
+
+#ifndef TINYRC4_CORE_H
+#define TINYRC4_CORE_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+/* Initialize S with 0-7 and T with the key (1-8 values) repeated. */
+static inline void
+rc4_init(uint8_t *S, uint8_t *T, const uint8_t *key, size_t key_len)
+{
+    size_t m;
+
+    for (m = 0; m < 8; m++) {
+        S[m] = (uint8_t)m;
+        T[m] = key[m % key_len] & 7;
+    }
+}
+
+/* Run KSA over S using T, then write n keystream values to out.
+ * All arithmetic is mod 8, done with "& 7" on byte-sized registers. */
+static inline void
+rc4_stream(uint8_t *S, uint8_t *T, uint8_t *out, size_t n)
+{
+    uint8_t i, j, si, sj;
+    size_t m;
+
+    /* Permute S array based on T array */
+    j = 0;
+    for (i = 0; i < 8; i++) {
+        si = S[i];
+        j = (j + si + T[i]) & 7;
+        S[i] = S[j];
+        S[j] = si;
+    }
+
+    /* Generate stream */
+    i = j = 0;
+    for (m = 0; m < n; m++) {
+        i = (i + 1) & 7;
+        si = S[i];
+        j = (j + si) & 7;
+        sj = S[j];
+        S[i] = sj;
+        S[j] = si;
+        out[m] = S[(si + sj) & 7];
+    }
+}
+
+#endif /* TINYRC4_CORE_H */
@@ -0,0 +1,13 @@
+#!/bin/sh
+# Compile the TinyRC4 core to WebAssembly for client-side execution.
+# Requires Emscripten (emcc). Outputs static/js/tinyrc4.mjs and tinyrc4.wasm.
+set -e
+cd "$(dirname "$0")/.."
+
+emcc wasm/tinyrc4_wasm.c -O3 \
+    -s MODULARIZE=1 \
+    -s EXPORT_ES6=1 \
+    -s ENVIRONMENT=web \
+    -s EXPORTED_FUNCTIONS=_tinyrc4_crypt,_malloc,_free \
+    -s EXPORTED_RUNTIME_METHODS=HEAPU8 \
+    -o static/js/tinyrc4.mjs
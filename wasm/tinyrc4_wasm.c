@@ -0,0 +1,30 @@
+/*
+ * TinyRC4 WebAssembly Build
+ * Browser-side encryption/decryption for the visualizer's instant mode.
+ * Build with wasm/build.sh (requires Emscripten).
+ */
+
+#include <emscripten.h>
+#include "../tinyrc4_core.h"
+
+/* XOR n 3-bit values from in with the keystream for key, writing to out.
+ * in and out must not overlap. Returns 0 on success, -1 for an invalid
+ * key length. */
+EMSCRIPTEN_KEEPALIVE int
+tinyrc4_crypt(const uint8_t *key, size_t key_len,
+              const uint8_t *in, uint8_t *out, size_t n)
+{
+    uint8_t S[8], T[8];
+    size_t m;
+
+    if (key_len < 1 || key_len > 8)
+        return -1;
+
+    rc4_init(S, T, key, key_len);
+    rc4_stream(S, T, out, n);
+
+    for (m = 0; m < n; m++)
+        out[m] ^= in[m];
+
+    return 0;
+}